@@ -1,13 +1,25 @@
 """Email CLI tool for querying emails using RAG."""
 from typing import List
-import click
-import json, click, logging
+import click, logging
 from datetime import datetime
-from imap_tools import MailBox, MailMessage
+from imap_tools import MailMessage
 from prettytable import PrettyTable
-import rich
-from config import get_env_var, OPENAI_CLIENT, STORE_NAME
+from config import (
+    get_env_var,
+    get_openai_client,
+    STORE_NAME,
+    IMAP_BULK,
+    EMBEDDING_CACHE_CAPACITY,
+    EMBEDDING_CACHE_TTL_S,
+    EMBED_BACKEND,
+    LOCAL_EMBED_MODEL,
+    LOCAL_EMBED_TOKENIZER,
+)
 from vector_db import EmailVectorStoreManager, OpenAIVectorBackend
+from email_agent.core.imap_pool import fetch_with_retry
+from email_agent.storage.ingest_cache import IngestCache
+from email_agent.rag.semantic_cache import SemanticCache
+from email_agent.utils.body import clean_body
 
 log = logging.getLogger(__name__)
 
@@ -18,28 +30,42 @@ def fetch_emails(unread: bool = False, limit: int = 50) -> List[MailMessage]:
     password = get_env_var("IMAP_PASSWORD")
 
     criteria = "UNSEEN" if unread else "ALL"
-    with MailBox(host).login(user, password) as mailbox:
-        return list(mailbox.fetch(criteria, limit=limit, reverse=True))
+    bulk = min(limit, IMAP_BULK)
+    return fetch_with_retry(
+        host,
+        user,
+        password,
+        lambda mailbox: list(
+            mailbox.fetch(
+                criteria, limit=limit, reverse=True, mark_seen=False, bulk=bulk
+            )
+        ),
+    )
 
 def display_emails(msgs: List[MailMessage]):
     if not msgs:
         click.echo("No emails found.")
         return
 
-    tbl = PrettyTable()
-    tbl.field_names = ["Date", "From", "Subject", "Size"]
-    for k in tbl.field_names:
-        tbl.align[k] = "l"
+    for line in _email_lines(msgs):
+        click.echo(line)
 
+def _email_lines(msgs: List[MailMessage]):
+    """Yield the listing one formatted line at a time (fixed column widths)."""
+    yield f"{'Date':<16} {'From':<30} {'Subject':<50} {'Size':>10}"
+    yield f"{'-' * 16} {'-' * 30} {'-' * 50} {'-' * 10}"
     for msg in msgs:
-        date = msg.date.strftime("%Y-%m-%d %H:%M") if isinstance(msg.date, datetime) else "?"
+        # isoformat is cheaper than strftime; [:16] drops seconds and tz offset.
+        date = (
+            msg.date.isoformat(sep=" ", timespec="minutes")[:16]
+            if isinstance(msg.date, datetime)
+            else "?"
+        )
         size = f"{msg.size / 1024:.1f} KB"
         subject = (msg.subject or "(no subject)")
         if len(subject) > 50:
             subject = subject[:47] + "…"
-        tbl.add_row([date, msg.from_, subject, size])
-
-    click.echo(tbl)
+        yield f"{date:<16} {msg.from_:<30.30} {subject:<50} {size:>10}"
 
 def summarize_with_gpt(emails_with_content):
     """Summarize emails using GPT."""
@@ -48,15 +74,19 @@ def summarize_with_gpt(emails_with_content):
         email_texts = []
         for email in emails_with_content:
             email_texts.append(
-                f"Date: {email.date}\n"
-                f"From: {email.from_}\n"
-                f"Subject: {email.subject}\n"
-                f"Content: {email.txt or email.html or ''}"
+                "\n".join(
+                    (
+                        f"Date: {email.date}",
+                        f"From: {email.from_}",
+                        f"Subject: {email.subject}",
+                        f"Content: {clean_body(email)}",
+                    )
+                )
             )
 
         combined_emails = "\n\n---\n\n".join(email_texts)
 
-        response = OPENAI_CLIENT.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -104,7 +134,8 @@ def list_emails(unread, limit):
 @cli.command("ingest")
 @click.option("--unread", is_flag=True, help="Ingest only unread messages")
 @click.option("--limit", default=50, show_default=True, help="Maximum messages to ingest")
-def ingest_emails(unread: bool, limit: int):
+@click.option("--stats", is_flag=True, help="Print ingest cache hit/miss counts")
+def ingest_emails(unread: bool, limit: int, stats: bool):
     """Fetch e‑mails and upload them into the vector store (deduplicated)."""
     click.echo(f"✉️  Fetching up to {limit} message(s) from IMAP …")
     msgs = fetch_emails(unread=unread, limit=limit)
@@ -113,17 +144,43 @@ def ingest_emails(unread: bool, limit: int):
         return
 
     manager = EmailVectorStoreManager(store_name=STORE_NAME)
+    cache = IngestCache()
+    if manager.backend.store_reset:
+        # Cached file IDs point into the vanished store; re-upload everything.
+        log.warning("Vector store was recreated; clearing the ingest cache.")
+        cache.clear()
 
-    added = 0
+    batch, keys, metadatas = [], [], []
     for msg in msgs:
-        metadata = {
+        digest, simhash = cache.digest(msg), cache.simhash(msg)
+        if (
+            cache.get(digest, simhash, sender=msg.from_, subject=msg.subject)
+            is not None
+        ):
+            continue  # Same content already uploaded.
+
+        batch.append(msg)
+        keys.append((digest, simhash, msg.from_, msg.subject))
+        metadatas.append({
             "from": msg.from_,
             "subject": msg.subject,
             "date": msg.date.isoformat() if isinstance(msg.date, datetime) else "",
-        }
-        manager.add_message(msg, metadata=metadata)
+        })
+
+    file_ids = manager.add_messages(batch, metadatas=metadatas)
+    added = 0
+    for (digest, simhash, sender, subject), file_id in zip(keys, file_ids):
+        if file_id is None:
+            continue  # Failed to embed; retried on the next ingest.
+        cache.add(digest, file_id, simhash, sender=sender, subject=subject)
         added += 1
 
+    if stats:
+        click.echo(
+            f"Ingest cache: {cache.hits} hit(s), {cache.near_hits} near hit(s), "
+            f"{cache.misses} miss(es)"
+        )
+
     click.echo(
         click.style(
             f"✅  Ingestion complete – {added} message(s) stored in vector store “{STORE_NAME}” (ID={manager.get_vector_store_id()}).",
@@ -131,9 +188,29 @@ def ingest_emails(unread: bool, limit: int):
         )
     )
 
+def embed_text(text: str) -> List[float]:
+    """Return the OpenAI embedding of *text* (used to key the semantic cache)."""
+    resp = get_openai_client().embeddings.create(
+        model="text-embedding-3-small", input=text
+    )
+    return resp.data[0].embedding
+
+def make_embedder():
+    """Return ``(embed, namespace)`` for the configured ``EMBED_BACKEND``."""
+    if EMBED_BACKEND == "openai":
+        return embed_text, "openai/text-embedding-3-small/1536"
+    if EMBED_BACKEND == "local":
+        # Imported lazily: onnxruntime/tokenizers are optional dependencies.
+        from email_agent.rag.local_embedder import LocalEmbedder
+
+        embedder = LocalEmbedder(LOCAL_EMBED_MODEL, LOCAL_EMBED_TOKENIZER)
+        return embedder, f"local/{embedder.name}/{LocalEmbedder.DIMENSIONS}"
+    raise click.ClickException(f"Unknown EMBED_BACKEND: {EMBED_BACKEND!r}")
+
 @cli.command("query")
 @click.argument("prompt", nargs=-1)
-def query_emails(prompt: tuple[str, ...]):
+@click.option("--no-cache", is_flag=True, help="Bypass the semantic response cache")
+def query_emails(prompt: tuple[str, ...], no_cache: bool):
     """Ask questions about the *already‑ingested* email corpus.
 
     Example::
@@ -142,23 +219,56 @@ def query_emails(prompt: tuple[str, ...]):
     """
     if not prompt:
         raise click.ClickException("Please provide a query prompt.")
+    # Imported here so commands that never print JSON don't pay for rich.
+    import rich
+
     user_prompt = " ".join(prompt)
     print(user_prompt)
 
     manager = EmailVectorStoreManager(store_name=STORE_NAME)
     vs_id = manager.get_vector_store_id()
 
+    # The semantic cache is best-effort: if the embedder or the cache database
+    # fails, log it and answer the query uncached.
+    cache, cached = None, None
+    if not no_cache:
+        try:
+            embed, namespace = make_embedder()
+            # Answers cite file IDs, so they only hold for the store they came
+            # from; a recreated store gets a fresh namespace.
+            cache = SemanticCache(
+                embed,
+                ttl=EMBEDDING_CACHE_TTL_S,
+                capacity=EMBEDDING_CACHE_CAPACITY,
+                namespace=f"{namespace}/{vs_id}",
+            )
+            cached = cache.get(user_prompt)
+        except Exception as exc:
+            log.warning("Semantic cache unavailable, querying uncached: %s", exc)
+            cache = None
+    if cached is not None:
+        click.echo("⚡  Answer served from semantic cache.")
+        rich.print_json(cached)
+        return
+
     click.echo("🤖  Running RAG query against vector store …")
     try:
-        response = OPENAI_CLIENT.responses.create(
+        response = get_openai_client().responses.create(
             model="o3-mini",
             input=f"{user_prompt}. Return these emails in a table and cite the emails you reference.",
             tools=[{"type": "file_search", "vector_store_ids": [vs_id]}],
         )
-        rich.print_json(data=json.loads(response.model_dump_json()))
+        response_json = response.model_dump_json()
     except Exception as exc:
         raise click.ClickException(f"Query failed: {exc}") from exc
 
+    rich.print_json(response_json)
+    if cache:
+        try:
+            cache.put(user_prompt, response_json)
+        except Exception as exc:
+            log.warning("Could not store answer in semantic cache: %s", exc)
+
 
 @cli.command("store-list")
 def list_store():
@@ -182,7 +292,7 @@ def list_store():
         tbl.align[k] = "l"
 
     for f in files:
-        meta = getattr(f, "metadata", {}) or {}
+        meta = getattr(f, "attributes", {}) or {}
         tbl.add_row([
             f.id,
             meta.get("from", ""),
@@ -1,7 +1,7 @@
 from dotenv import load_dotenv
+from functools import lru_cache
 import logging
 import os
-from openai import OpenAI
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,12 +13,42 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
+# Environment variables don't change during a run; remember each lookup.
+@lru_cache(maxsize=None)
 def get_env_var(name):
     value = os.environ.get(name)
     if not value:
         raise ValueError(f"Missing required environment variable: {name}")
     return value
 
-OPENAI_CLIENT = OpenAI(api_key=get_env_var("OPENAI_API_KEY"))
+# One client (and connection pool) for the whole process. HTTP/2 lets the
+# parallel uploads/deletes multiplex over a few TLS connections. Built on first
+# use: importing openai/httpx costs hundreds of ms that commands like `list`
+# never need.
+@lru_cache(maxsize=None)
+def get_openai_client():
+    import httpx
+    from openai import DefaultHttpxClient, OpenAI
 
-STORE_NAME = "emails"
\ No newline at end of file
+    return OpenAI(
+        api_key=get_env_var("OPENAI_API_KEY"),
+        http_client=DefaultHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        ),
+    )
+
+STORE_NAME = "emails"
+
+# Messages per IMAP UID FETCH round-trip (imap_tools ``bulk=``). Some servers
+# reject oversized FETCH requests, so this also caps the UID list length.
+IMAP_BULK = int(os.getenv("IMAP_BULK_SIZE", "100"))
+
+# Semantic query cache bounds: entry count (LRU-evicted) and freshness.
+EMBEDDING_CACHE_CAPACITY = int(os.getenv("EMBEDDING_CACHE_CAPACITY", "10000"))
+EMBEDDING_CACHE_TTL_S = float(os.getenv("EMBEDDING_CACHE_TTL_S", "3600"))
+
+# Embeddings for the semantic cache: "openai" (API) or "local" (ONNX on CPU).
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "openai").lower()
+LOCAL_EMBED_MODEL = os.getenv("LOCAL_EMBED_MODEL", "all-MiniLM-L6-v2.onnx")
+LOCAL_EMBED_TOKENIZER = os.getenv("LOCAL_EMBED_TOKENIZER", "tokenizer.json")
@@ -1,27 +1,31 @@
-from openai import OpenAI
-import os, logging
+from concurrent.futures import ThreadPoolExecutor
+import logging, queue, sys, threading
+from config import get_openai_client
 
-client = OpenAI()
-
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format="%(asctime)s [%(levelname)5s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+client = get_openai_client()
 log = logging.getLogger(__name__)
 
+# Concurrent file deletions per vector store (calls are network-bound).
+DELETE_WORKERS = 16
+# Vector stores torn down in parallel once the lister has collected them.
+STORE_WORKERS = 8
+
+def delete_file(v_id, file_id):
+    try:
+        client.vector_stores.files.delete(
+            vector_store_id=v_id,
+            file_id=file_id)
+        client.files.delete(file_id)
+    except Exception as e:
+        log.debug("Skip file %s: %s", file_id, e)
+
 def delete_vector_store(v_id):
-    files = client.vector_stores.files.list(
-            vector_store_id=v_id).data
-    for f in files:
-        try:
-            client.vector_stores.files.delete(
-                vector_store_id=v_id,
-                file_id=f.id)
-            client.files.delete(f.id)
-        except Exception as e:
-            log.debug("Skip file %s: %s", f.id, e)
+    # Walk every page up front; ``.data`` alone stops after the first 100.
+    file_ids = [
+        f.id for f in client.vector_stores.files.list(vector_store_id=v_id, limit=100)
+    ]
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as ex:
+        list(ex.map(lambda file_id: delete_file(v_id, file_id), file_ids))
 
     # finally remove the store
     try:
@@ -30,14 +34,50 @@ def delete_vector_store(v_id):
     except Exception as e:
         log.warning("Could not delete vector store: %s", e)
 
-if __name__ == "__main__":
-    j = 0
+def list_vector_stores(store_ids, errors):
+    """Collect every vector store, then feed their IDs to the deleters.
+
+    All pages are walked before the first ID is queued: deleting stores while
+    paging can leave the ``after`` cursor pointing at a store that is gone.
+    Any listing error is appended to *errors*.
+    """
+    try:
+        stores = list(client.vector_stores.list(limit=100))
+        for i, v_store in enumerate(stores):
+            log.info(f"{i}: Deleting vector store {v_store.name}")
+            store_ids.put(v_store.id)
+    except Exception as e:
+        log.error("Could not list vector stores: %s", e)
+        errors.append(e)
+    finally:
+        for _ in range(STORE_WORKERS):
+            store_ids.put(None)
+
+def delete_vector_stores(store_ids):
+    """Delete stores from *store_ids* until the ``None`` sentinel arrives."""
     while True:
-        vector_stores = client.vector_stores.list(limit=100)
-        if len(vector_stores.data) == 0:
-            log.exception(f"Exitting program, no more vector stores.")
-            quit()
-        for i, v_store in enumerate(vector_stores):
-            log.info(f"{j} + {i}: Deleting vector store {v_store.name}")
-            delete_vector_store(v_store.id)
-        j += 1
+        v_id = store_ids.get()
+        if v_id is None:
+            return
+        try:
+            delete_vector_store(v_id)
+        except Exception as e:
+            log.warning("Could not delete vector store %s: %s", v_id, e)
+
+if __name__ == "__main__":
+    store_ids = queue.Queue(maxsize=32)
+    errors = []
+    threads = [
+        threading.Thread(target=list_vector_stores, args=(store_ids, errors))
+    ]
+    threads += [
+        threading.Thread(target=delete_vector_stores, args=(store_ids,))
+        for _ in range(STORE_WORKERS)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        sys.exit("Stopped early: listing vector stores failed.")
+    log.info("Exiting program, no more vector stores.")
@@ -1,7 +1,6 @@
 """Command-line interface for the email agent."""
 
 import click
-from prettytable import PrettyTable
 from email_agent.core.email_handler import EmailHandler
 from email_agent.storage.vector_store import VectorStore
 from email_agent.rag.query_engine import QueryEngine
@@ -14,25 +13,27 @@ def display_emails(emails):
         click.echo("No emails found.")
         return
 
-    table = PrettyTable()
-    table.field_names = ["Date", "From", "Subject", "Size", "Human"]
-    table.align["Date"] = "l"
-    table.align["Subject"] = "l"
-    table.align["From"] = "l"
-    table.align["Size"] = "r"
-    table.align["Human"] = "c"
+    for line in _email_lines(emails):
+        click.echo(line)
 
+
+def _email_lines(emails):
+    """Yield the email table one formatted line at a time.
+
+    Column widths are fixed up front, so rows are printed as they are produced
+    instead of being buffered to measure the widest cell.
+    """
+    yield f"{'Date':<16} {'From':<30} {'Subject':<53} {'Size':>10} {'Human':^5}"
+    yield f"{'-' * 16} {'-' * 30} {'-' * 53} {'-' * 10} {'-' * 5}"
     for email in emails:
-        date = email.date.strftime("%Y-%m-%d %H:%M")
+        date = email.date.isoformat(sep=" ", timespec="minutes")[:16]
         size = f"{email.size / 1024:.1f} KB"
         subject = (
             email.subject[:50] + "..." if len(email.subject) > 50 else email.subject
         )
         human = "✓" if email.is_human else "✗"
 
-        table.add_row([date, email.from_, subject, size, human])
-
-    click.echo(table)
+        yield f"{date:<16} {email.from_:<30.30} {subject:<53} {size:>10} {human:^5}"
 
 
 @click.group()
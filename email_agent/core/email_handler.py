@@ -1,9 +1,18 @@
 """Core email handling functionality."""
 
+import re
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
-from imap_tools import MailBox, MailMessage
+from imap_tools import MailMessage
+from email_agent.core.imap_pool import fetch_with_retry
+from email_agent.utils.config import IMAP_BULK
+
+# Sender prefixes that mark an email as automated, matched in a single pass.
+_AUTOMATED_RE = re.compile(
+    r"noreply@|no-reply@|donotreply@|auto@|automated@|system@|notification@",
+    re.IGNORECASE,
+)
 
 
 @dataclass
@@ -30,9 +39,19 @@ class EmailHandler:
         """Fetch emails from the mailbox."""
         criteria = "UNSEEN" if unread else "ALL"
 
-        with MailBox(self.host).login(self.user, self.password) as mailbox:
-            messages = list(mailbox.fetch(criteria, limit=limit, reverse=True))
-            return [self._process_email(msg) for msg in messages]
+        bulk = min(limit, IMAP_BULK)
+
+        messages = fetch_with_retry(
+            self.host,
+            self.user,
+            self.password,
+            lambda mailbox: list(
+                mailbox.fetch(
+                    criteria, limit=limit, reverse=True, mark_seen=False, bulk=bulk
+                )
+            ),
+        )
+        return [self._process_email(msg) for msg in messages]
 
     def _process_email(self, message: MailMessage) -> Email:
         """Process a raw email message into our Email dataclass."""
@@ -51,16 +70,4 @@ class EmailHandler:
         This is a basic implementation that can be enhanced with more sophisticated
         detection methods in the future.
         """
-        # Basic checks for automated emails
-        automated_indicators = [
-            "noreply@",
-            "no-reply@",
-            "donotreply@",
-            "auto@",
-            "automated@",
-            "system@",
-            "notification@",
-        ]
-
-        from_address = message.from_.lower()
-        return not any(indicator in from_address for indicator in automated_indicators)
+        return _AUTOMATED_RE.search(message.from_) is None
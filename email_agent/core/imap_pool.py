@@ -0,0 +1,90 @@
+"""Process-wide cache of logged-in IMAP connections."""
+
+import atexit
+import imaplib
+import time
+from typing import Callable, Dict, Tuple, TypeVar
+from imap_tools import MailBox
+
+# Servers may drop idle sessions after 30 minutes (RFC 3501), so anything idle
+# for longer than this is probed with NOOP before being handed out again.
+KEEPALIVE_INTERVAL = 25 * 60
+
+_pool: Dict[Tuple[str, str], Tuple[MailBox, float]] = {}
+
+T = TypeVar("T")
+
+
+def get_mailbox(host: str, user: str, password: str) -> MailBox:
+    """Return a logged-in ``MailBox`` for *user* on *host*, reusing a cached one.
+
+    Connections idle for longer than ``KEEPALIVE_INTERVAL`` are checked with a
+    NOOP and transparently replaced if the server has gone away.
+    """
+    key = (host, user)
+    entry = _pool.get(key)
+    if entry is not None:
+        mailbox, last_used = entry
+        if time.monotonic() - last_used < KEEPALIVE_INTERVAL or _is_alive(mailbox):
+            _pool[key] = (mailbox, time.monotonic())
+            return mailbox
+        evict(host, user)
+
+    try:
+        mailbox = MailBox(host).login(user, password)
+    except (OSError, imaplib.IMAP4.abort):
+        # The connection dropped mid-handshake; retry once from scratch.  A
+        # rejected login (MailboxLoginError) is not retried, so a bad password
+        # doesn't count twice towards the server's lockout threshold.
+        mailbox = MailBox(host).login(user, password)
+
+    _pool[key] = (mailbox, time.monotonic())
+    return mailbox
+
+
+def fetch_with_retry(
+    host: str, user: str, password: str, fn: Callable[[MailBox], T]
+) -> T:
+    """Run *fn* against the pooled mailbox, reconnecting once if it has died.
+
+    A cached session that the server dropped between keepalive checks only
+    fails once used, so on a socket or IMAP error the entry is evicted and
+    *fn* is retried on a fresh connection.
+    """
+    try:
+        return fn(get_mailbox(host, user, password))
+    except (OSError, imaplib.IMAP4.abort, imaplib.IMAP4.error):
+        evict(host, user)
+        return fn(get_mailbox(host, user, password))
+
+
+def evict(host: str, user: str) -> None:
+    """Drop (and log out) the cached connection for *user* on *host*, if any."""
+    entry = _pool.pop((host, user), None)
+    if entry is not None:
+        _logout(entry[0])
+
+
+def close_all() -> None:
+    """Log out every cached connection."""
+    while _pool:
+        _, (mailbox, _) = _pool.popitem()
+        _logout(mailbox)
+
+
+def _is_alive(mailbox: MailBox) -> bool:
+    try:
+        mailbox.client.noop()
+    except (OSError, imaplib.IMAP4.error):
+        return False
+    return True
+
+
+def _logout(mailbox: MailBox) -> None:
+    try:
+        mailbox.logout()
+    except (OSError, imaplib.IMAP4.error):
+        pass
+
+
+atexit.register(close_all)
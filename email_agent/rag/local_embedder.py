@@ -0,0 +1,63 @@
+"""Local sentence embeddings via an ONNX export of all-MiniLM-L6-v2.
+
+Requires the optional ``onnxruntime``, ``tokenizers`` and ``numpy`` packages
+(``pip install email_agent[local-embed]``).
+"""
+
+import os
+from pathlib import Path
+from typing import List, Union
+import numpy as np
+import onnxruntime
+from tokenizers import Tokenizer
+
+
+class LocalEmbedder:
+    """Embeds text on the CPU, avoiding a network call per embedding."""
+
+    DIMENSIONS = 384
+
+    def __init__(
+        self,
+        model_path: Union[str, os.PathLike] = "all-MiniLM-L6-v2.onnx",
+        tokenizer_path: Union[str, os.PathLike] = "tokenizer.json",
+        max_length: int = 256,
+    ):
+        """Load the ONNX model and its tokenizer.
+
+        Args:
+            model_path: Path to the exported ``.onnx`` model
+            tokenizer_path: Path to the matching Hugging Face ``tokenizer.json``
+            max_length: Token limit; longer inputs are truncated
+        """
+        self.name = Path(model_path).stem
+        self._session = onnxruntime.InferenceSession(
+            str(model_path), providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self._tokenizer.enable_truncation(max_length)
+
+    def __call__(self, text: str) -> List[float]:
+        """Return the mean-pooled, L2-normalised embedding of *text*.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            List[float]: A ``DIMENSIONS``-long unit vector
+        """
+        encoding = self._tokenizer.encode(text)
+        input_ids = np.array([encoding.ids], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self._session.run(None, feeds)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(
+            mask.sum(axis=1), 1e-9, None
+        )
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled[0].tolist()
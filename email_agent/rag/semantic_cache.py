@@ -0,0 +1,163 @@
+"""Embedding-keyed cache of query responses."""
+
+import math
+import operator
+import os
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Union
+
+
+class SemanticCache:
+    """Returns a stored response when a new prompt means the same as an old one.
+
+    Prompts are embedded and compared by cosine similarity, so rephrasings such
+    as "show food coupons" / "any restaurant promo emails" can share an answer.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]],
+        db_path: Union[str, os.PathLike] = "semantic_cache.db",
+        threshold: float = 0.92,
+        ttl: float = 3600.0,
+        capacity: int = 10000,
+        namespace: str = "",
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            embed: Function turning a prompt into an embedding vector
+            db_path: Location of the SQLite file backing the cache
+            threshold: Minimum cosine similarity for a cached answer to be reused
+            ttl: Seconds after which a cached answer is considered stale
+            capacity: Maximum number of entries kept; least recently used go first
+            namespace: Embedding backend/model/dimension tag; entries are only
+                compared against others written under the same namespace
+        """
+        self._embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self.namespace = namespace
+        self._last: Optional[tuple] = None
+        self._conn = sqlite3.connect(Path(db_path))
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                embedding  BLOB NOT NULL,
+                prompt     TEXT NOT NULL,
+                response   TEXT NOT NULL,
+                created    REAL NOT NULL,
+                last_access REAL NOT NULL DEFAULT 0,
+                namespace  TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(semantic_cache)")
+        }
+        for column, decl in (
+            ("last_access", "REAL NOT NULL DEFAULT 0"),
+            ("namespace", "TEXT NOT NULL DEFAULT ''"),
+        ):
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE semantic_cache ADD COLUMN {column} {decl}"
+                )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS semantic_cache_last_access "
+            "ON semantic_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cached response closest to *prompt*, if similar enough.
+
+        Args:
+            prompt: The user's query
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss
+        """
+        query = self._embedding(prompt)
+        # Only embeddings are scanned; the (large) response text is read for
+        # the winning row alone.
+        rows = self._conn.execute(
+            "SELECT rowid, embedding FROM semantic_cache "
+            "WHERE namespace = ? AND created >= ?",
+            (self.namespace, time.time() - self.ttl),
+        )
+
+        best_sim, best_rowid = -1.0, None
+        for rowid, blob in rows:
+            vec = array("f")
+            vec.frombytes(blob)
+            sim = sum(map(operator.mul, query, vec))
+            if sim > best_sim:
+                best_sim, best_rowid = sim, rowid
+
+        if best_sim <= self.threshold:
+            return None
+        row = self._conn.execute(
+            "SELECT response FROM semantic_cache WHERE rowid = ?", (best_rowid,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE semantic_cache SET last_access = ? WHERE rowid = ?",
+            (time.time(), best_rowid),
+        )
+        self._conn.commit()
+        return row[0]
+
+    def put(self, prompt: str, response: str) -> None:
+        """Store *response* as the answer to *prompt*.
+
+        Args:
+            prompt: The user's query
+            response: The response to return for similar future queries
+        """
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO semantic_cache"
+            "(embedding, prompt, response, created, last_access, namespace) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self._embedding(prompt).tobytes(),
+                prompt,
+                response,
+                now,
+                now,
+                self.namespace,
+            ),
+        )
+        self._evict(now)
+        self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop stale entries, then least recently used ones beyond capacity."""
+        self._conn.execute(
+            "DELETE FROM semantic_cache WHERE created < ?", (now - self.ttl,)
+        )
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM semantic_cache"
+        ).fetchone()
+        if count > self.capacity:
+            self._conn.execute(
+                "DELETE FROM semantic_cache WHERE rowid IN ("
+                "SELECT rowid FROM semantic_cache ORDER BY last_access LIMIT ?)",
+                (count - self.capacity,),
+            )
+
+    def _embedding(self, prompt: str) -> array:
+        """Embed and L2-normalise *prompt*, reusing the last result for get/put."""
+        if self._last is not None and self._last[0] == prompt:
+            return self._last[1]
+        raw: List[float] = list(self._embed(prompt))
+        norm = math.sqrt(sum(x * x for x in raw)) or 1.0
+        vec = array("f", (x / norm for x in raw))
+        self._last = (prompt, vec)
+        return vec
@@ -0,0 +1,199 @@
+"""Content-hash cache that lets ingestion skip messages it has already uploaded."""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Union
+from imap_tools import MailMessage
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _hamming(a: int, b: int) -> int:
+    """Number of differing bits between two 64-bit fingerprints."""
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+class IngestCache:
+    """Maps a hash of each message's content to the vector-store file holding it.
+
+    Unlike the UID-based index kept by the vector store manager, the key only
+    depends on what the message says, so the same email re-delivered under a
+    new UID (moved folder, UIDVALIDITY reset) is still recognised.
+
+    Each entry also keeps a 64-bit SimHash of the body.  A message within
+    ``MAX_HAMMING`` bits of a cached one from the same sender with the same
+    subject is counted as a near hit, but is still uploaded: templated mail
+    (statements, receipts) differs only in a few figures, which SimHash
+    cannot tell apart from a trivial edit.
+    """
+
+    MAX_HAMMING = 3
+
+    def __init__(self, db_path: Union[str, os.PathLike] = "ingest_cache.db"):
+        """Open (or create) the cache database.
+
+        Args:
+            db_path: Location of the SQLite file backing the cache
+        """
+        self._conn = sqlite3.connect(Path(db_path))
+        self._conn.create_function("hamming", 2, _hamming, deterministic=True)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingest_cache (
+                hash       TEXT PRIMARY KEY,
+                file_id    TEXT NOT NULL,
+                created    REAL NOT NULL,
+                simhash    INTEGER,
+                sender     TEXT,
+                subject    TEXT
+            )
+            """
+        )
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(ingest_cache)")
+        }
+        for column, decl in (
+            ("simhash", "INTEGER"),
+            ("sender", "TEXT"),
+            ("subject", "TEXT"),
+        ):
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE ingest_cache ADD COLUMN {column} {decl}"
+                )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ingest_cache_sender_subject "
+            "ON ingest_cache(sender, subject)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(msg: MailMessage) -> str:
+        """Return the SHA-256 content hash of *msg*.
+
+        Args:
+            msg: The message to hash
+
+        Returns:
+            str: Hex digest over subject, sender, date and body
+        """
+        # Fields are joined as bytes with a unit separator and hashed in one
+        # hashlib call, which runs in OpenSSL's C (SHA-NI where available).
+        # Don't reach for Numba here: it is poor at str/bytes work and would be
+        # slower than this single C-level call.
+        date = msg.date.isoformat() if isinstance(msg.date, datetime) else ""
+        content = b"\x1f".join(
+            (
+                (msg.subject or "").encode(),
+                (msg.from_ or "").encode(),
+                date.encode(),
+                (msg.text or msg.html or "").encode(),
+            )
+        )
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def simhash(msg: MailMessage) -> int:
+        """Return a 64-bit SimHash of *msg*'s body words.
+
+        Args:
+            msg: The message to fingerprint
+
+        Returns:
+            int: The fingerprint, as a signed integer so SQLite can store it
+        """
+        body = msg.text or msg.html or ""
+        weights = [0] * 64
+        for token in _TOKEN_RE.findall(body.lower()):
+            h = int.from_bytes(
+                hashlib.blake2b(token.encode(), digest_size=8).digest(), "big"
+            )
+            for bit in range(64):
+                weights[bit] += 1 if h >> bit & 1 else -1
+
+        value = sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+        return value - (1 << 64) if value >= 1 << 63 else value
+
+    def get(
+        self,
+        digest: str,
+        simhash: Optional[int] = None,
+        *,
+        sender: Optional[str] = None,
+        subject: Optional[str] = None,
+    ) -> Optional[str]:
+        """Look up the file ID stored for *digest*, counting hits and misses.
+
+        Args:
+            digest: A hash produced by :meth:`digest`
+            simhash: Optional fingerprint from :meth:`simhash`; when the exact
+                hash is unknown, the closest entry with the same *sender* and
+                *subject* is looked up and counted as a near hit
+            sender: The message's sender, required for a near-hit lookup
+            subject: The message's subject, required for a near-hit lookup
+
+        Returns:
+            Optional[str]: The file ID if this exact content was ingested before
+        """
+        row = self._conn.execute(
+            "SELECT file_id FROM ingest_cache WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row:
+            self.hits += 1
+            return row[0]
+        if simhash is not None and sender is not None and subject is not None:
+            row = self._conn.execute(
+                "SELECT hamming(simhash, ?) AS distance FROM ingest_cache "
+                "WHERE simhash IS NOT NULL AND sender = ? AND subject = ? "
+                "AND distance <= ? ORDER BY distance LIMIT 1",
+                (simhash, sender, subject, self.MAX_HAMMING),
+            ).fetchone()
+            if row:
+                # Reported only: the message may differ in what matters.
+                self.near_hits += 1
+                return None
+        self.misses += 1
+        return None
+
+    def clear(self) -> None:
+        """Forget every entry, e.g. after the vector store they point into is gone."""
+        self._conn.execute("DELETE FROM ingest_cache")
+        self._conn.commit()
+
+    def add(
+        self,
+        digest: str,
+        file_id: str,
+        simhash: Optional[int] = None,
+        *,
+        sender: Optional[str] = None,
+        subject: Optional[str] = None,
+    ) -> bool:
+        """Remember that *digest* is stored as *file_id*.
+
+        Args:
+            digest: A hash produced by :meth:`digest`
+            file_id: The vector-store file ID holding the content
+            simhash: Optional fingerprint from :meth:`simhash`
+            sender: The message's sender, for near-hit lookups
+            subject: The message's subject, for near-hit lookups
+
+        Returns:
+            bool: True if a new entry was written, False if one already existed
+        """
+        cur = self._conn.execute(
+            "INSERT OR IGNORE INTO ingest_cache"
+            "(hash, file_id, created, simhash, sender, subject) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (digest, file_id, time.time(), simhash, sender, subject),
+        )
+        self._conn.commit()
+        return cur.rowcount == 1
@@ -1,8 +1,12 @@
 """Vector store for email storage and retrieval."""
 
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from datetime import datetime
-from email_agent.core.email_handler import Email
+
+if TYPE_CHECKING:
+    # Annotation-only: keeps email_handler (and imap_tools) out of the import
+    # graph of anything that merely imports the storage layer.
+    from email_agent.core.email_handler import Email
 
 
 class VectorStore:
@@ -14,7 +18,7 @@ class VectorStore:
         # TODO: Initialize pgvector connection
         # This will be implemented when we add the database integration
 
-    def store_email(self, email: Email) -> bool:
+    def store_email(self, email: "Email") -> bool:
         """Store an email in the vector database.
 
         Args:
@@ -26,7 +30,7 @@ class VectorStore:
         # TODO: Implement email storage with embeddings
         pass
 
-    def query_emails(self, query: str, limit: int = 10) -> List[Email]:
+    def query_emails(self, query: str, limit: int = 10) -> List["Email"]:
         """Query emails using semantic search.
 
         Args:
@@ -39,7 +43,7 @@ class VectorStore:
         # TODO: Implement semantic search
         pass
 
-    def get_email_by_id(self, email_id: str) -> Optional[Email]:
+    def get_email_by_id(self, email_id: str) -> Optional["Email"]:
         """Retrieve a specific email by its ID.
 
         Args:
@@ -0,0 +1,36 @@
+"""Helpers for turning an email body into prompt-ready plain text."""
+
+from typing import Optional
+from imap_tools import MailMessage
+from selectolax.lexbor import LexborHTMLParser
+
+
+def html_to_text(html: str) -> str:
+    """Return the visible text of an HTML document.
+
+    Args:
+        html: The markup to extract text from
+
+    Returns:
+        str: Text of the ``<body>`` (or whole document), without scripts and styles
+    """
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(["script", "style"])
+    node = tree.body or tree.root
+    return node.text(separator=" ", strip=True) if node else ""
+
+
+def clean_body(msg: MailMessage, limit: Optional[int] = 1000) -> str:
+    """Return the plain-text body of *msg*, truncated to *limit* characters.
+
+    Args:
+        msg: The message whose body to extract
+        limit: Maximum number of characters to return (None for no limit)
+
+    Returns:
+        str: ``msg.text`` if present, otherwise the visible text of ``msg.html``
+    """
+    text = (msg.text or "").strip()
+    if not text and msg.html:
+        text = html_to_text(msg.html)
+    return text if limit is None else text[:limit]
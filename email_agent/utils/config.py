@@ -1,15 +1,21 @@
 """Configuration utilities."""
 
 import os
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Number of messages requested per IMAP UID FETCH round-trip. Some servers
+# reject oversized FETCH requests, so this also caps the UID list length.
+IMAP_BULK = int(os.getenv("IMAP_BULK_SIZE", "100"))
 
+
+@lru_cache(maxsize=None)
 def get_env_var(name: str, default: Optional[str] = None) -> str:
-    """Get an environment variable.
+    """Get an environment variable (memoized; the environment is read once).
 
     Args:
         name: The name of the environment variable
@@ -27,8 +33,9 @@ def get_env_var(name: str, default: Optional[str] = None) -> str:
     return value
 
 
+@lru_cache(maxsize=None)
 def get_db_connection_string() -> str:
-    """Get the database connection string from environment variables."""
+    """Get the database connection string from environment variables (memoized)."""
     host = get_env_var("DB_HOST")
     port = get_env_var("DB_PORT", "5432")
     user = get_env_var("DB_USER")
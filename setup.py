@@ -6,16 +6,21 @@ setup(
     packages=find_packages(),
     install_requires=[
         "click>=8.0.0",
-        "imap-tools>=1.0.0",
+        "imap-tools>=1.6.0",
         "python-dotenv>=0.19.0",
         "prettytable>=2.0.0",
         "pre-commit>=2.0.0",
         "psycopg2-binary>=2.9.0",
         "pgvector>=0.1.0",
-        "openai>=1.0.0",
+        "openai>=1.66.0",
+        "httpx[http2]>=0.23.0",
         "langchain>=0.1.0",
         "tiktoken>=0.5.0",
+        "selectolax>=0.3.17",
     ],
+    extras_require={
+        "local-embed": ["onnxruntime>=1.16.0", "tokenizers>=0.15.0", "numpy>=1.21.0"],
+    },
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
@@ -0,0 +1,53 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from click.testing import CliRunner
+
+import cli
+from email_agent.storage.ingest_cache import IngestCache, _hamming
+from test_vector_db_index import FakeBackend
+from vector_db import EmailVectorStoreManager
+
+TEMPLATE = " ".join(
+    f"clause {i} of your monthly account statement terms and conditions"
+    for i in range(30)
+)
+
+
+def _statement(uid, account, balance, day):
+    return SimpleNamespace(
+        uid=uid,
+        from_="statements@bank.example",
+        subject="Your monthly statement",
+        date=datetime(2024, 5, day),
+        text=f"Account {account}\nBalance {balance}\nDate 2024-05-{day:02d}\n"
+        + TEMPLATE,
+        html="",
+        size=1024,
+    )
+
+
+def test_templated_emails_are_both_uploaded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = FakeBackend()
+    monkeypatch.setattr(
+        cli,
+        "EmailVectorStoreManager",
+        lambda store_name: EmailVectorStoreManager(
+            store_name=store_name, db_path=tmp_path / "index.db", backend=backend
+        ),
+    )
+    first = _statement(1, "12345678", "1,024.50", 3)
+    second = _statement(2, "87654321", "98.10", 4)
+    # Close enough that a SimHash match alone would have merged them.
+    distance = _hamming(IngestCache.simhash(first), IngestCache.simhash(second))
+    assert distance <= IngestCache.MAX_HAMMING
+
+    runner = CliRunner()
+    for msg in (first, second):
+        monkeypatch.setattr(cli, "fetch_emails", lambda unread, limit, m=msg: [m])
+        result = runner.invoke(cli.cli, ["ingest", "--stats"])
+        assert result.exit_code == 0, result.output
+
+    assert backend.added == ["1.txt", "2.txt"]
+    assert "1 near hit(s)" in result.output
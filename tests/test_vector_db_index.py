@@ -0,0 +1,69 @@
+import hashlib
+import sqlite3
+from types import SimpleNamespace
+
+from vector_db import INDEX_VERSION, BaseVectorBackend, EmailVectorStoreManager
+
+
+class FakeBackend(BaseVectorBackend):
+    """Hands out sequential file IDs without touching the network."""
+
+    def __init__(self):
+        self.added = []
+
+    def add_file(self, *, file_bytes, file_name, metadata=None):
+        self.added.append(file_name)
+        return f"file-{len(self.added)}"
+
+    def delete_file(self, *, file_id):
+        pass
+
+    def get_vector_store_id(self):
+        return "vs-test"
+
+
+def _message(uid, text):
+    return SimpleNamespace(uid=uid, text=text, html="", subject="Hello")
+
+
+def test_legacy_sha256_index_still_resolves(tmp_path):
+    db_path = tmp_path / "index.db"
+    messages = [_message(1, "first body"), _message(2, "second body")]
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE emails (hash TEXT PRIMARY KEY, file_id TEXT NOT NULL)")
+    for m in messages:
+        digest = hashlib.sha256(f"{m.uid}\x00{m.text}".encode()).hexdigest()
+        conn.execute(
+            "INSERT INTO emails(hash, file_id) VALUES (?, ?)", (digest, f"old-{m.uid}")
+        )
+    conn.commit()
+    conn.close()
+
+    backend = FakeBackend()
+    manager = EmailVectorStoreManager(db_path=db_path, backend=backend)
+
+    assert manager.add_messages(messages) == ["old-1", "old-2"]
+    assert manager.add_message(messages[0]) == "old-1"
+    assert backend.added == []
+    (hash_type,) = [
+        row[2]
+        for row in manager._conn.execute("PRAGMA table_info(emails)")
+        if row[1] == "hash"
+    ]
+    assert hash_type.upper() == "BLOB"
+    assert manager._conn.execute("PRAGMA user_version").fetchone() == (0,)
+
+
+def test_fresh_index_uses_blake2b(tmp_path):
+    manager = EmailVectorStoreManager(
+        db_path=tmp_path / "index.db", backend=FakeBackend()
+    )
+    message = _message(7, "body")
+
+    assert manager._conn.execute("PRAGMA user_version").fetchone() == (INDEX_VERSION,)
+    assert INDEX_VERSION == 1
+    file_id = manager.add_message(message)
+    expected = hashlib.blake2b(b"7\x00body", digest_size=32).digest()
+    assert manager._conn.execute(
+        "SELECT file_id FROM emails WHERE hash = ?", (expected,)
+    ).fetchone() == (file_id,)
@@ -2,14 +2,22 @@ from __future__ import annotations
 
 import hashlib
 import io
+import logging
 import os
 import sqlite3
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from imap_tools.message import MailMessage 
-from config import OPENAI_CLIENT
+from config import get_openai_client
+from email_agent.utils.body import html_to_text
+
+log = logging.getLogger(__name__)
 
 __all__ = [
     "EmailVectorStoreManager",
@@ -24,6 +32,10 @@ __all__ = [
 class BaseVectorBackend(ABC):
     """Abstract interface any vector‑store backend must implement."""
 
+    #: Set when the store previously used was gone and a new one was opened,
+    #: so file IDs recorded against the old store no longer exist.
+    store_reset = False
+
     @abstractmethod
     def add_file(
         self,
@@ -34,10 +46,33 @@ class BaseVectorBackend(ABC):
     ) -> str:
         """Store *one* document and return its **file/vector ID**."""
 
+    def add_files_batch(
+        self,
+        files: List[Tuple[bytes, str, Optional[Dict[str, Any]]]],
+    ) -> List[Optional[str]]:
+        """Store many ``(file_bytes, file_name, metadata)`` documents at once.
+
+        Returns the **file/vector IDs** in input order, with ``None`` for any
+        document the backend failed to store.  The default simply loops over
+        :meth:`add_file`; backends should override it when they can do better.
+        """
+        return [
+            self.add_file(file_bytes=data, file_name=name, metadata=metadata)
+            for data, name, metadata in files
+        ]
+
     @abstractmethod
     def delete_file(self, *, file_id: str) -> None:
         """Remove a document (identified by *file_id*) from the store."""
 
+    def purge_file(self, *, file_id: str) -> None:
+        """Remove a document and any storage behind it.
+
+        Defaults to :meth:`delete_file`; backends that keep the uploaded
+        content separately from the store should release it here too.
+        """
+        self.delete_file(file_id=file_id)
+
     @abstractmethod
     def get_vector_store_id(self) -> str:
         """Return the backend‑specific *vector store ID* (stable identifier)."""
@@ -49,11 +84,26 @@ class BaseVectorBackend(ABC):
 class OpenAIVectorBackend(BaseVectorBackend):
     """Implementation backed by **OpenAI Vector Store**."""
 
-    def __init__(self, *, store_name: str) -> None:
-        self.client = OPENAI_CLIENT
+    #: Parallel ``files.create`` uploads issued by :meth:`add_files_batch`.
+    UPLOAD_CONCURRENCY = 8
+    #: Upper bound on ``file_ids`` accepted by one vector‑store file batch.
+    MAX_BATCH_FILES = 500
+    #: Parallel ``vector_stores.files.update`` calls setting file attributes.
+    ATTRIBUTE_CONCURRENCY = 16
+    #: OpenAI caps string attribute values at this many characters.
+    MAX_ATTRIBUTE_LENGTH = 512
+
+    def __init__(
+        self,
+        *,
+        store_name: str,
+        db_path: str | os.PathLike[str] | None = None,
+    ) -> None:
+        """*db_path*, if given, is a SQLite file used to remember the store ID."""
+        self.client = get_openai_client()
+        self._db_path = Path(db_path) if db_path is not None else None
         # Re‑use existing store or create a new one with the given *name*.
-        vs = self._get_or_create_store(store_name)
-        self._vector_store_id: str = vs.id
+        self._vector_store_id: str = self._resolve_store_id(store_name)
 
     # ------------------------------------------------------------------
     # Public API – implementation of BaseVectorBackend
@@ -66,22 +116,70 @@ class OpenAIVectorBackend(BaseVectorBackend):
         file_name: str,
         metadata: Optional[Dict[str, Any]] | None = None,
     ) -> str:
-        buffer = io.BytesIO(file_bytes)
-        buffer.name = file_name 
-        file_obj = self.client.files.create(
-            file=buffer,
-            purpose="assistants",
-        )
-        # # 2️⃣  Attach custom metadata, if provided.
-        # if metadata:
-        #     self.client.files.update(file_obj.id, metadata=metadata)
+        file_id = self._upload(file_bytes, file_name)
 
-        # 3️⃣  Attach to the vector store (blocking until processed).
+        # 2️⃣  Attach to the vector store (blocking until processed).
         self.client.vector_stores.file_batches.create(
             vector_store_id=self._vector_store_id,
-            file_ids=[file_obj.id],
+            file_ids=[file_id],
         )
-        return file_obj.id
+
+        # 3️⃣  Attach custom metadata as vector‑store file attributes.
+        if metadata:
+            self._set_attributes(file_id, metadata)
+        return file_id
+
+    def add_files_batch(
+        self,
+        files: List[Tuple[bytes, str, Optional[Dict[str, Any]]]],
+    ) -> List[Optional[str]]:
+        """Upload all *files* concurrently from memory, then attach them in bulk.
+
+        One ``file_batches.create_and_poll`` per :attr:`MAX_BATCH_FILES`
+        replaces the per‑file attach call of :meth:`add_file`; metadata is then
+        applied with concurrent attribute updates.  Files that fail to upload
+        or embed (or whose whole batch fails) are cleaned up and returned as
+        ``None``, so one bad request doesn't abort the rest.
+        """
+        if not files:
+            return []
+        with ThreadPoolExecutor(max_workers=self.UPLOAD_CONCURRENCY) as pool:
+            futures = [pool.submit(self._upload, data, name) for data, name, _ in files]
+        result: List[Optional[str]] = []
+        for future, (_, name, _) in zip(futures, files):
+            exc = future.exception()
+            if exc is not None:
+                log.warning("Could not upload %s: %s", name, exc)
+            result.append(None if exc is not None else future.result())
+
+        uploaded = [fid for fid in result if fid is not None]
+        failed: Set[str] = set()
+        for start in range(0, len(uploaded), self.MAX_BATCH_FILES):
+            chunk = uploaded[start : start + self.MAX_BATCH_FILES]
+            try:
+                failed.update(self._attach(chunk))
+            except Exception as exc:
+                log.warning("Could not attach %d file(s): %s", len(chunk), exc)
+                failed.update(chunk)
+        if failed:
+            log.warning("%d file(s) were not embedded; discarding them", len(failed))
+            self._discard(failed)
+        result = [None if fid in failed else fid for fid in result]
+
+        tagged = [(fid, f[2]) for fid, f in zip(result, files) if fid and f[2]]
+        if tagged:
+            # Attributes are best-effort: the files are already embedded, so a
+            # failed PATCH is logged rather than losing the whole batch.
+            with ThreadPoolExecutor(max_workers=self.ATTRIBUTE_CONCURRENCY) as pool:
+                futures = {
+                    pool.submit(self._set_attributes, fid, meta): fid
+                    for fid, meta in tagged
+                }
+            for future, file_id in futures.items():
+                exc = future.exception()
+                if exc is not None:
+                    log.warning("Could not set attributes on %s: %s", file_id, exc)
+        return result
 
     def delete_file(self, *, file_id: str) -> None:
         self.client.vector_stores.files.delete(
@@ -89,6 +187,11 @@ class OpenAIVectorBackend(BaseVectorBackend):
             file_id=file_id,
         )
 
+    def purge_file(self, *, file_id: str) -> None:
+        """Detach *file_id* from the store and delete the upload itself."""
+        self.delete_file(file_id=file_id)
+        self.client.files.delete(file_id)
+
     def get_vector_store_id(self) -> str: 
         return self._vector_store_id
 
@@ -96,9 +199,102 @@ class OpenAIVectorBackend(BaseVectorBackend):
     # Helpers
     # ------------------------------------------------------------------
 
+    def _attach(self, file_ids: List[str]) -> Set[str]:
+        """Attach *file_ids* in one batch; return the IDs that did not embed."""
+        batch = self.client.vector_stores.file_batches.create_and_poll(
+            vector_store_id=self._vector_store_id,
+            file_ids=file_ids,
+        )
+        if batch.status != "completed":
+            return set(file_ids)
+        if not batch.file_counts.failed:
+            return set()
+        return {
+            f.id
+            for f in self.client.vector_stores.file_batches.list_files(
+                batch_id=batch.id,
+                vector_store_id=self._vector_store_id,
+                filter="failed",
+            )
+        }
+
+    def _discard(self, file_ids: Iterable[str]) -> None:
+        """Best‑effort removal of uploads that won't be indexed."""
+        for file_id in file_ids:
+            try:
+                self.delete_file(file_id=file_id)
+            except Exception as exc:
+                log.debug("Skip detaching %s: %s", file_id, exc)
+            try:
+                self.client.files.delete(file_id)
+            except Exception as exc:
+                log.warning("Could not delete upload %s: %s", file_id, exc)
+
+    def _upload(self, file_bytes: bytes, file_name: str) -> str:
+        buffer = io.BytesIO(file_bytes)
+        buffer.name = file_name
+        file_obj = self.client.files.create(
+            file=buffer,
+            purpose="assistants",
+        )
+        return file_obj.id
+
+    def _set_attributes(self, file_id: str, metadata: Dict[str, Any]) -> None:
+        attributes: Dict[str, Any] = {
+            key: value[: self.MAX_ATTRIBUTE_LENGTH] if isinstance(value, str) else value
+            for key, value in metadata.items()
+            if value is not None
+        }
+        attributes["file_id"] = file_id
+        self.client.vector_stores.files.update(
+            vector_store_id=self._vector_store_id,
+            file_id=file_id,
+            attributes=attributes,
+        )
+
+    def _resolve_store_id(self, name: str) -> str:
+        """Return the ID of the store called *name*, preferring the local record.
+
+        A remembered ID is confirmed with a single ``retrieve`` (the store may
+        have been deleted since) instead of paging through every store.
+        """
+        from openai import NotFoundError
+
+        if self._db_path is None:
+            return self._get_or_create_store(name).id
+
+        key = f"vector_store_id:{name}"
+        conn = sqlite3.connect(self._db_path)
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS kv (
+                    key        TEXT PRIMARY KEY,
+                    value      TEXT NOT NULL
+                )
+                """
+            )
+            row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            if row:
+                try:
+                    return self.client.vector_stores.retrieve(row[0]).id
+                except NotFoundError:
+                    # Stale – fall through and look it up again.
+                    self.store_reset = True
+
+            vs_id = self._get_or_create_store(name).id
+            conn.execute(
+                "INSERT OR REPLACE INTO kv(key, value) VALUES (?, ?)", (key, vs_id)
+            )
+            conn.commit()
+            return vs_id
+        finally:
+            conn.close()
+
     def _get_or_create_store(self, name: str):
-        page = self.client.vector_stores.list(limit=100)
-        for vs in page.data:
+        # Iterating the page follows the cursor, so stores past the first 100
+        # are found instead of silently creating a duplicate.
+        for vs in self.client.vector_stores.list(limit=100):
             if vs.name == name:
                 return vs
         # Not found – create a fresh one.
@@ -108,6 +304,15 @@ class OpenAIVectorBackend(BaseVectorBackend):
 # Manager with local SQLite index (deduplication)
 ###############################################################################
 
+# Bound parameters per statement on SQLite builds older than 3.32.
+SQLITE_MAX_VARIABLES = 999
+
+# ``PRAGMA user_version`` of the index: 0 = SHA‑256 digests, 1 = BLAKE2b.
+INDEX_VERSION = 1
+
+# Digest → file ID entries remembered in memory to skip repeat SQLite lookups.
+LOOKUP_CACHE_SIZE = 4096
+
 class EmailVectorStoreManager:
     """High‑level convenience wrapper around a :class:BaseVectorBackend."""
 
@@ -118,67 +323,161 @@ class EmailVectorStoreManager:
         db_path: str | os.PathLike[str] = "vector_store_index.db",
         backend: Optional[BaseVectorBackend] = None,
     ) -> None:
-        self.backend = backend or OpenAIVectorBackend(store_name=store_name)
-        self._conn = sqlite3.connect(Path(db_path))
+        self.backend = backend or OpenAIVectorBackend(
+            store_name=store_name, db_path=db_path
+        )
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        # Autocommit mode: transactions are opened explicitly (see _write) so
+        # batch inserts are one BEGIN IMMEDIATE … COMMIT.  Neither _write nor
+        # the in‑memory LRU is locked, so the manager must stay on one thread
+        # (sqlite3's default same‑thread check enforces that).
+        # The statement cache is sized for every ``IN (?, …)`` arity used by
+        # _lookup_many on top of the fixed queries, so none get re‑parsed.
+        self._conn = sqlite3.connect(
+            Path(db_path),
+            isolation_level=None,
+            cached_statements=1024,
+        )
+        # WAL + NORMAL sync: commits append to the log instead of fsyncing the
+        # main file each time; a 64 MB page cache keeps the index in memory.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-64000")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
         self._conn.execute(
             """
             CREATE TABLE IF NOT EXISTS emails (
-                hash       TEXT PRIMARY KEY,
+                hash       BLOB PRIMARY KEY,
                 file_id    TEXT NOT NULL
             )
             """
         )
-        self._conn.commit()
+        self._migrate_hex_hashes()
+        if self.backend.store_reset:
+            # Every indexed file lived in the vanished store; start afresh.
+            log.warning(
+                "Vector store %r was recreated; clearing the stale index %s",
+                store_name,
+                db_path,
+            )
+            with self._write():
+                self._conn.execute("DELETE FROM emails")
+                self._conn.execute("PRAGMA user_version = 0")
+            self._cache.clear()
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        empty = not self._conn.execute("SELECT 1 FROM emails LIMIT 1").fetchone()
+        if version == 0 and empty:
+            self._conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            version = INDEX_VERSION
+        # Indexes written before BLAKE2b keep SHA‑256 so their keys stay valid.
+        self._hasher = (
+            hashlib.sha256 if version == 0 else partial(hashlib.blake2b, digest_size=32)
+        )
 
     # ------------------------------------------------------------------
     # Public helpers – new MailMessage‑centric API
     # ------------------------------------------------------------------
 
-    def add_message(self, msg: MailMessage, *, metadata: Optional[Dict[str, Any]] = None) -> str:
+    def add_message(
+        self,
+        msg: MailMessage,
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        commit: bool = True,
+    ) -> str:
         """Add one *MailMessage*; returns the **file/vector ID**.
 
-        Duplicate detection uses a stable SHA‑256 hash of
-        msg.message_id (fallback to uid) + body.
+        Duplicate detection uses a stable BLAKE2b‑256 hash (SHA‑256 for
+        older indexes) of msg.message_id (fallback to uid) + body.
+
+        Pass ``commit=False`` when adding many messages in a loop and call
+        :meth:`commit` once at the end.
         """
         body = self._get_message_body(msg)
         message_id = self._get_message_id(msg)
         subject = msg.subject or "(no subject)"
 
         digest = self._digest(message_id, body)
-        cur = self._conn.execute("SELECT file_id FROM emails WHERE hash = ?", (digest,))
-        row = cur.fetchone()
-        if row:
-            return row[0]  # Already ingested.
+        known = self._lookup(digest)
+        if known is not None:
+            return known  # Already ingested.
 
-        payload = f"Subject: {subject}\n\n{body}"
+        payload = f"Subject: {subject}\n\n{self._get_message_text(msg)}"
         file_id = self.backend.add_file(
             file_bytes=payload.encode(),
             file_name=f"{message_id}.txt",
             metadata=metadata,
         )
-        self._conn.execute(
-            "INSERT INTO emails(hash, file_id) VALUES (?, ?)", (digest, file_id)
-        )
-        self._conn.commit()
+        [(_, file_id)] = self._index([(digest, file_id)], commit=commit)
         return file_id
 
+    def add_messages(
+        self,
+        msgs: Sequence[MailMessage],
+        *,
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        batch_size: int = 100,
+    ) -> List[Optional[str]]:
+        """Add many *MailMessage*s at once; returns their **file/vector IDs**.
+
+        Deduplicates like :meth:`add_message`, but known digests are resolved
+        with chunked ``IN (...)`` queries and new messages go to the backend
+        *batch_size* at a time via :meth:`BaseVectorBackend.add_files_batch`,
+        each batch committed to the index in one transaction.  Messages the
+        backend failed to store are not indexed and come back as ``None``.
+        """
+        if metadatas is None:
+            metadatas = [None] * len(msgs)
+
+        message_ids = [self._get_message_id(msg) for msg in msgs]
+        digests = [
+            self._digest(message_id, self._get_message_body(msg))
+            for message_id, msg in zip(message_ids, msgs)
+        ]
+        known = self._lookup_many(digests)
+
+        pending: Dict[bytes, Tuple[bytes, str, Optional[Dict[str, Any]]]] = {}
+        rows = zip(msgs, message_ids, digests, metadatas)
+        for msg, message_id, digest, metadata in rows:
+            if digest in known or digest in pending:
+                continue  # Already ingested (or repeated within this call).
+            subject = msg.subject or "(no subject)"
+            payload = f"Subject: {subject}\n\n{self._get_message_text(msg)}"
+            pending[digest] = (payload.encode(), f"{message_id}.txt", metadata)
+
+        items = list(pending.items())
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            file_ids = self.backend.add_files_batch([files for _, files in batch])
+            rows = [
+                (digest, file_id)
+                for (digest, _), file_id in zip(batch, file_ids)
+                if file_id is not None
+            ]
+            known.update(self._index(rows))
+
+        return [known.get(digest) for digest in digests]
+
     def delete_message(self, msg: MailMessage) -> bool:
         """Remove a MailMessage. Returns **True** if deletion occurred."""
         body = self._get_message_body(msg)
         message_id = self._get_message_id(msg)
         digest = self._digest(message_id, body)
 
-        cur = self._conn.execute("SELECT file_id FROM emails WHERE hash = ?", (digest,))
-        row = cur.fetchone()
-        if not row:
+        file_id = self._lookup(digest)
+        if file_id is None:
             return False  # Nothing to do.
 
-        file_id: str = row[0]
         self.backend.delete_file(file_id=file_id)
         self._conn.execute("DELETE FROM emails WHERE hash = ?", (digest,))
-        self._conn.commit()
+        self._cache.pop(digest, None)
         return True
 
+    def commit(self) -> None:
+        """Persist index rows written with ``commit=False``."""
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+
     def get_vector_store_id(self) -> str:
         return self.backend.get_vector_store_id()
 
@@ -186,14 +485,136 @@ class EmailVectorStoreManager:
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _index(
+        self, rows: List[Tuple[bytes, str]], *, commit: bool = True
+    ) -> List[Tuple[bytes, str]]:
+        """Record freshly uploaded ``(digest, file_id)`` pairs in one statement.
+
+        ``INSERT OR IGNORE`` makes the write idempotent: if another writer
+        indexed a digest between our lookup and this insert, its file ID wins
+        and our duplicate upload is purged from the backend.  Returns the
+        pairs that are actually indexed.
+        """
+        if not commit and not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")  # Left open for commit().
+        with self._write():
+            cur = self._conn.executemany(
+                "INSERT OR IGNORE INTO emails(hash, file_id) VALUES (?, ?)", rows
+            )
+        if cur.rowcount != len(rows):
+            stored = self._lookup_many([digest for digest, _ in rows])
+            for digest, file_id in rows:
+                if stored[digest] != file_id:
+                    self.backend.purge_file(file_id=file_id)
+            rows = [(digest, stored[digest]) for digest, _ in rows]
+        for digest, file_id in rows:
+            self._remember(digest, file_id)
+        return rows
+
+    def _migrate_hex_hashes(self) -> None:
+        """Rewrite an index created with 64‑char hex ``TEXT`` keys to raw BLOBs.
+
+        Raw 32‑byte keys halve the primary‑key B‑tree, so more of it fits per
+        page.  Done in Python because ``unhex()`` needs SQLite 3.41+.
+        """
+        columns = self._conn.execute("PRAGMA table_info(emails)").fetchall()
+        if not any(col[1] == "hash" and col[2].upper() == "TEXT" for col in columns):
+            return
+        rows = self._conn.execute("SELECT hash, file_id FROM emails").fetchall()
+        with self._write():
+            self._conn.execute("DROP TABLE IF EXISTS emails_new")
+            self._conn.execute(
+                "CREATE TABLE emails_new (hash BLOB PRIMARY KEY, file_id TEXT NOT NULL)"
+            )
+            self._conn.executemany(
+                "INSERT INTO emails_new(hash, file_id) VALUES (?, ?)",
+                ((bytes.fromhex(h) if isinstance(h, str) else h, f) for h, f in rows),
+            )
+            self._conn.execute("DROP TABLE emails")
+            self._conn.execute("ALTER TABLE emails_new RENAME TO emails")
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """Run the block in ``BEGIN IMMEDIATE … COMMIT``, or join an open one."""
+        if self._conn.in_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _lookup(self, digest: bytes) -> Optional[str]:
+        """Return the file ID indexed under *digest*, checking memory first."""
+        file_id = self._cache.get(digest)
+        if file_id is not None:
+            self._cache.move_to_end(digest)
+            return file_id
+        row = self._conn.execute(
+            "SELECT file_id FROM emails WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._remember(digest, row[0])
+        return row[0]
+
+    def _lookup_many(self, digests: Sequence[bytes]) -> Dict[bytes, str]:
+        """Map every already‑indexed digest in *digests* to its file ID."""
+        found: Dict[bytes, str] = {}
+        missing: List[bytes] = []
+        for digest in dict.fromkeys(digests):
+            file_id = self._cache.get(digest)
+            if file_id is None:
+                missing.append(digest)
+            else:
+                self._cache.move_to_end(digest)
+                found[digest] = file_id
+
+        for start in range(0, len(missing), SQLITE_MAX_VARIABLES):
+            chunk = missing[start : start + SQLITE_MAX_VARIABLES]
+            placeholders = ", ".join("?" * len(chunk))
+            for digest, file_id in self._conn.execute(
+                f"SELECT hash, file_id FROM emails WHERE hash IN ({placeholders})",
+                chunk,
+            ):
+                found[digest] = file_id
+                self._remember(digest, file_id)
+        return found
+
+    def _remember(self, digest: bytes, file_id: str) -> None:
+        """Record a lookup result, evicting the least recently used entry."""
+        self._cache[digest] = file_id
+        self._cache.move_to_end(digest)
+        if len(self._cache) > LOOKUP_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
     @staticmethod
     def _get_message_body(msg: MailMessage) -> str:
         return (msg.text or "") or (msg.html or "")
+
+    @staticmethod
+    def _get_message_text(msg: MailMessage) -> str:
+        """Plain text to upload: ``msg.text``, else the visible text of ``msg.html``.
+
+        The raw body (markup included) still feeds :meth:`_digest`, so existing
+        index entries stay valid.
+        """
+        if msg.text:
+            return msg.text
+        return html_to_text(msg.html) if msg.html else ""
     
     @staticmethod
     def _get_message_id(msg: MailMessage) -> str:
         return str(msg.uid)
 
-    @staticmethod
-    def _digest(message_id: str, body: str) -> str:  # pragma: no cover
-        return hashlib.sha256(f"{message_id}\x00{body}".encode()).hexdigest()
\ No newline at end of file
+    def _digest(self, message_id: str, body: str | bytes) -> bytes:  # pragma: no cover
+        # Feed the pieces separately instead of building one f‑string copy of
+        # the (possibly large) body and then encoding that copy again.
+        h = self._hasher()
+        h.update(message_id.encode())
+        h.update(b"\x00")
+        h.update(body.encode() if isinstance(body, str) else body)
+        return h.digest()
\ No newline at end of file